@@ -0,0 +1,48 @@
+import math
+
+# Numba is optional: without it the kernel still runs as plain Python.
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        return wrap
+
+# Fixed signature forces compilation at import time (no lazy dispatch on the
+# first calculation) and cache=True persists the compiled binary across
+# container restarts, avoiding the multi-second JIT penalty on cold start.
+_SIGNATURE = "f8(f8,f8,f8,f8,f8,f8,f8,f8,f8,f8,f8,f8,f8)"
+
+@njit(_SIGNATURE, cache=True)
+def _calc_kernel(hme, mle, go, ve, gm, fme, ee, hce, a, r, le, i, r_rate):
+    # Total annual expenses
+    annual_expenses = 12.0 * (hme + mle + go + fme + hce) + ve + gm + ee
+
+    # Adjust for inflation from now to retirement
+    years_to_retirement = r - a
+    inflation_adjusted_expenses = annual_expenses * math.exp(
+        years_to_retirement * math.log1p(i)
+    )
+
+    # Number of years in retirement
+    years_in_retirement = le - r
+
+    # Real return rate (investment return adjusted for inflation)
+    real_return_rate = r_rate - i
+
+    # NaN sentinel: nopython mode cannot surface st.error, so the Python
+    # wrapper turns this into the user-facing message
+    if real_return_rate < 0.0:
+        return math.nan
+
+    # Degenerate r -> 0 limit when the return rate matches inflation
+    if abs(real_return_rate) < 1e-12:
+        return inflation_adjusted_expenses * years_in_retirement
+
+    # Annuity factor (1 - (1 + r) ** -n) / r in its expm1/log1p form
+    annuity_factor = -math.expm1(
+        -years_in_retirement * math.log1p(real_return_rate)
+    ) / real_return_rate
+
+    return inflation_adjusted_expenses * annuity_factor